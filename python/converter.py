@@ -1,17 +1,14 @@
-from libraries.pcube import read, write, Orientation, Compression
-from libraries.packing import pack, unpack
-import numpy as np
+from libraries.pcube import read, write, Orientation, Compression, gzip_compresslevel
+from libraries.cache import load_ids, save_ids
 import argparse
 
-def npy_to_pcube(infile, outfile, orientation, compress):
-    cubes = np.load(infile, allow_pickle=True)
-    packed = [pack(cube) for cube in cubes]
-    write(outfile, orientation, packed, compress)
+def npy_to_pcube(infile, outfile, orientation, compress, compresslevel=gzip_compresslevel, threads=1):
+    packed = load_ids(infile)
+    write(outfile, orientation, packed, compress, compresslevel, threads)
 
 def pcube_to_npy(infile, outfile):
     result = read(infile)
-    unpacked = [unpack(cube) for cube in result.polycubes]
-    np.save(outfile, unpacked)
+    save_ids(outfile, result.polycubes)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -20,9 +17,13 @@ if __name__ == "__main__":
 
     parser.add_argument('filename', metavar='File Name', type=str,
                         help='The File to convert')
-    parser.add_argument('--compress', dest='compress', action='append', type=int, default=0, choices=[0,1],
+    parser.add_argument('--compress', dest='compress', type=int, default=0, choices=[0,1],
                         help='whether to compress the cubes if writing to the pcubes format, options are: 0: no compression 1: gzip compression')
-    parser.add_argument('--orientation', dest='orientation', action='append', type=int, default=0, choices=[0,1],
+    parser.add_argument('--compresslevel', dest='compresslevel', type=int, default=gzip_compresslevel, choices=range(10),
+                        help='the gzip level to compress with, lower is faster and higher is smaller')
+    parser.add_argument('--threads', dest='threads', type=int, default=1,
+                        help='the number of threads to compress with, only used when isal is installed')
+    parser.add_argument('--orientation', dest='orientation', type=int, default=0, choices=[0,1],
                         help='whether the cubes are oriented, options are: 0: unoriented 1: orientated by bitwise highest value')
     args = parser.parse_args()
 
@@ -34,7 +35,7 @@ if __name__ == "__main__":
         if(filename.endswith('.npy')):
             output_file_name = filename.removesuffix('.npy') + '.pcube'
             with open(output_file_name, 'xb') as ofp:
-                npy_to_pcube(fp, ofp, orientation, compress)
+                npy_to_pcube(fp, ofp, orientation, compress, args.compresslevel, args.threads)
         elif(filename.endswith('.pcube')):
             output_file_name = filename.removesuffix('.pcube') + '.npy'
             with open(output_file_name, 'xb') as ofp:
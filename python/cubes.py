@@ -1,19 +1,19 @@
 import numpy as np
 import argparse
 from time import perf_counter
-from libraries.cache import get_cache, save_cache, cache_exists
-from libraries.resizing import expand_cube
-from libraries.packing import pack, unpack
-from libraries.renderer import render_shapes
-from libraries.rotation import all_rotations
+from libraries.cache import get_cache_ids, save_cache_ids, cache_exists
+from libraries.resizing import expand_cube_batches
+from libraries.packing import pack, unpack_many, packing_weights
+from libraries.parallel import dispatch_tasks
+from libraries.renderer import render_shapes, render_mesh
+from libraries.rotation import canonical_rotation_indexes, precompute_rotation_indexes
 
 
-def log_if_needed(n, total_n):
-    if (n == total_n or n % 100 == 0):
-        print(f"\rcompleted {(n / total_n) * 100:.2f}%", end="\n" if n == total_n else "")
+def log_progress(n, total_n):
+    print(f"\rcompleted {(n / total_n) * 100:.2f}%", end="\n" if n == total_n else "")
 
 
-def generate_polycubes(n: int, use_cache: bool = False) -> list[np.ndarray]:
+def generate_polycubes(n: int, use_cache: bool = False, parallel: bool = True) -> list[np.ndarray]:
     """
     Generates all polycubes of size n
 
@@ -24,6 +24,7 @@ def generate_polycubes(n: int, use_cache: bool = False) -> list[np.ndarray]:
     Parameters:
     n (int): The size of the polycubes to generate, e.g. all combinations of n=4 cubes.
     use_cahe (bool): whether to use cache files. 
+    parallel (bool): whether to hash the polycubes across multiple processes.
 
     Returns:
     list(np.array): Returns a list of all polycubes of size n as numpy byte arrays
@@ -36,64 +37,189 @@ def generate_polycubes(n: int, use_cache: bool = False) -> list[np.ndarray]:
     elif n == 2:
         return [np.ones((2, 1, 1), dtype=np.byte)]
 
+    cube_ids = generate_polycube_ids(n, use_cache, parallel)
+    return unpack_many(cube_ids)
+
+
+def generate_polycube_ids(n: int, use_cache: bool = False, parallel: bool = True) -> list[bytes]:
+    """
+    Generates the packed ids of all polycubes of size n
+
+    Works like generate_polycubes, but keeps every level packed, which takes a fraction
+    of the memory of holding each polycube as a numpy array. Only the level that is
+    asked for by generate_polycubes is ever unpacked.
+
+    Parameters:
+    n (int): The size of the polycubes to generate, e.g. all combinations of n=4 cubes.
+    use_cache (bool): whether to use cache files. 
+    parallel (bool): whether to hash the polycubes across multiple processes.
+
+    Returns:
+    list(bytes): Returns a list of the ids of all polycubes of size n
+
+    """
+    if n <= 2:
+        return [pack(polycube) for polycube in generate_polycubes(n, use_cache, parallel)]
+
     if (use_cache and cache_exists(n)):
-        results = get_cache(n)
+        cube_ids = get_cache_ids(n)
         print(f"\nGot polycubes from cache n={n}")
-    else:
-        pollycubes = generate_polycubes(n-1, use_cache)
+        return cube_ids
+
+    cube_ids = hash_polycubes(n, generate_polycube_ids(n-1, use_cache, parallel), parallel)
+
+    if (use_cache):
+        save_cache_ids(n, cube_ids)
+
+    return cube_ids
+
 
-        known_ids = set()
-        done = 0
-        print(f"\nHashing polycubes n={n}")
-        for base_cube in pollycubes:
-            for new_cube in expand_cube(base_cube):
-                cube_id = get_canonical_packing(new_cube, known_ids)
-                known_ids.add(cube_id)
-            log_if_needed(done, len(pollycubes))
-            done += 1
-        log_if_needed(done, len(pollycubes))
+def hash_polycubes(n: int, base_ids: list[bytes], parallel: bool = True) -> list[bytes]:
+    """
+    Finds the ids of all polycubes of size n from the ids of all polycubes of size n-1
+
+    Parameters:
+    n (int): The size of the polycubes to find.
+    base_ids (list[bytes]): the ids of all polycubes of size n-1.
+    parallel (bool): whether to hash the polycubes across multiple processes.
+
+    Returns:
+    list(bytes): Returns a list of the ids of all polycubes of size n
+
+    """
+    known_ids = {}
+    precompute_rotation_indexes(n)
+    print(f"\nHashing polycubes n={n}")
+    for done, chunk_ids in dispatch_tasks(hash_cubes_task, base_ids, ordered=False, parallel=parallel):
+        # shards are disjoint, so each is merged only with its counterpart
+        for shape, shard in chunk_ids.items():
+            known_ids.setdefault(shape, set()).update(shard)
+        log_progress(done, len(base_ids))
+
+    cube_ids = []
+    for shape, shard in known_ids.items():
+        cube_ids.extend(shape + bits for bits in shard)
+        shard.clear()
+    return cube_ids
 
-        print(f"\nGenerating polycubes from hash n={n}")
-        results = []
-        done = 0
-        for cube_id in known_ids:
-            results.append(unpack(cube_id))
-            log_if_needed(done, len(known_ids))
-            done += 1
-        log_if_needed(done, len(known_ids))
 
-    if (use_cache and not cache_exists(n)):
-        save_cache(n, results)
+def add_expansions(base_cubes: list[np.ndarray], known_ids: dict[bytes, set[bytes]]) -> None:
+    """
+    Adds the ids of every polycube that extends one of the given polycubes to the known ids.
+
+    Known ids are sharded by the shape of the canonical rotation, which is the shape of
+    the polycube with its dimensions in descending order. Shards are disjoint, so each can
+    be grown and merged independently, and no single set grows to hold every id.
+    As the shard gives the shape, the ids are stored without their shape header.
+
+    Parameters:
+    base_cubes (list[np.array]): 3D Numpy byte arrays where 1 values indicate polycube positions
+    known_ids (dict[bytes, set[bytes]]): the packed bits of the known polycube ids, keyed by their packed shape
 
-    return results
+    """
+    # expansions of all the base cubes fall into a handful of shapes,
+    # each of which is canonicalised in one batch
+    new_cubes = {}
+    for base_cube in base_cubes:
+        for batch in expand_cube_batches(base_cube):
+            new_cubes.setdefault(batch.shape[1:], []).append(batch)
+
+    for shape, batches in new_cubes.items():
+        shard = known_ids.setdefault(bytes(sorted(shape, reverse=True)), set())
+        shard.update(get_canonical_bits(np.concatenate(batches)))
 
 
-def get_canonical_packing(polycube: np.ndarray, 
-                          known_ids: set[bytes]) -> bytes:
+def hash_cubes_task(base_ids: list[bytes]) -> dict[bytes, set[bytes]]:
     """
-    Determines if a polycube has already been seen.
+    Finds the ids of every polycube that extends one of the given polycubes.
 
-    Considers all possible rotations of a polycube against the existing 
-        ones stored in memory. Returns the id if it's found in the set,
-        or the maximum id of all rotations if the polycube is new.
+    Runs as a task in a worker process. The base polycubes are sent packed, as
+    bytes pickle far smaller than numpy arrays, and are only unpacked here.
+    The expansions of the whole chunk are canonicalised together.
+
+    Parameters:
+    base_ids (list[bytes]): packed ids of the polycubes to expand
+
+    Returns:
+    dict[bytes, set[bytes]]: the packed bits of the canonical ids of all expansions of the base polycubes, keyed by their packed shape
+
+    """
+    known_ids = {}
+    add_expansions(unpack_many(base_ids), known_ids)
+    return known_ids
+
+
+def get_canonical_packings(polycubes: list[np.ndarray]) -> list[bytes]:
+    """
+    Finds the canonical ids of a batch of polycubes of the same shape.
+
+    The canonical id is the maximum id of all rotations.
+
+    Parameters:
+    polycubes (list[np.array]): 3D Numpy byte arrays of equal shape where 1 values
+        indicate cube positions
+
+    Returns:
+    cube_ids (list[bytes]): the id for each cube
+
+    """
+    header = bytes(sorted(polycubes[0].shape, reverse=True))
+    return [header + bits for bits in get_canonical_bits(polycubes)]
+
+
+def get_canonical_bits(polycubes: list[np.ndarray]) -> list[bytes]:
+    """
+    Finds the canonical ids of a batch of polycubes of the same shape, without their shape header.
+
+    Gathers the rotations of every polycube in the batch at once. The canonical
+    rotation always has the dimensions of the polycubes in descending order.
+
+    Parameters:
+    polycubes (list[np.array] or np.array): 3D Numpy byte arrays of equal shape where 1 values
+        indicate cube positions, or a 4D array of them
+
+    Returns:
+    list[bytes]: the packed bits of the canonical id of each cube
+
+    """
+    indexes, _ = canonical_rotation_indexes(polycubes[0].shape)
+    # cells must be unsigned, as numpy multiplies signed ones by the uint64 weights in float64,
+    # which cannot hold every bit of a word
+    rotations = np.reshape(polycubes, (len(polycubes), -1)).take(indexes, axis=1).astype(np.uint8, copy=False)
+
+    # all candidate rotations share the same shape, so only their bits need comparing.
+    # each rotation is reduced straight to big-endian 64 bit words, which order the same as
+    # its packed bytes, comparing a word at a time while some rotations are still tied.
+    # only the winning rotation of each cube is then packed
+    keys = np.einsum('krs,sw->krw', rotations, packing_weights(indexes.shape[1]))
+    best = np.ones(keys.shape[:2], dtype=bool)
+    for word in range(keys.shape[2]):
+        if word and (best.sum(axis=1) == 1).all():
+            break
+        candidates = np.where(best, keys[:, :, word], 0)
+        best &= candidates == candidates.max(axis=1, keepdims=True)
+
+    winners = rotations[np.arange(len(rotations)), best.argmax(axis=1)]
+    return [winner.tobytes() for winner in np.packbits(winners, axis=1, bitorder='little')]
+
+
+def get_canonical_packing(polycube: np.ndarray) -> bytes:
+    """
+    Finds the canonical id of a polycube.
+
+    The canonical id is the maximum id of all rotations of the polycube. Every known id
+    is canonical, so a polycube has been seen before exactly when its canonical id is in
+    the known set, and only that one id ever needs looking up.
 
     Parameters:
     polycube (np.array): 3D Numpy byte array where 1 values indicate 
         cube positions. Must be of type np.int8
-    known_ids (set[bytes]): A set of all known polycube ids
 
     Returns:
     cube_id (bytes): the id for this cube
 
     """
-    max_id = b'\x00'
-    for cube_rotation in all_rotations(polycube):
-        this_id = pack(cube_rotation)
-        if (this_id in known_ids):
-            return this_id
-        if (this_id > max_id):
-            max_id = this_id
-    return max_id
+    return get_canonical_packings([polycube])[0]
 
 
 if __name__ == "__main__":
@@ -107,17 +233,21 @@ if __name__ == "__main__":
     # Requires python >=3.9
     parser.add_argument('--cache', action=argparse.BooleanOptionalAction)
     parser.add_argument('--render', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--mesh', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--parallel', action=argparse.BooleanOptionalAction)
 
     args = parser.parse_args()
 
     n = args.n
     use_cache = args.cache if args.cache is not None else True
     render = args.render if args.render is not None else False
+    mesh = args.mesh if args.mesh is not None else False
+    parallel = args.parallel if args.parallel is not None else True
 
     # Start the timer
     t1_start = perf_counter()
 
-    all_cubes = generate_polycubes(n, use_cache=use_cache)
+    all_cubes = generate_polycubes(n, use_cache=use_cache, parallel=parallel)
 
     # Stop the timer
     t1_stop = perf_counter()
@@ -125,5 +255,8 @@ if __name__ == "__main__":
     if (render):
         render_shapes(all_cubes, "./out")
 
+    if (mesh):
+        render_mesh(all_cubes, "./out")
+
     print(f"\nFound {len(all_cubes)} unique polycubes")
     print(f"\nElapsed time: {round(t1_stop - t1_start,3)}s")
@@ -1,5 +1,6 @@
 import os
 import numpy as np
+from libraries.packing import pack, unpack_many, split_ids
 
 cache_path_fstring = "cubes_{0}.npy"
 
@@ -19,6 +20,49 @@ def cache_exists(n: int) -> bool:
     return os.path.exists(cache_path)
 
 
+def load_array(file) -> np.ndarray:
+    """
+    Loads the array stored in a cache file, memory mapping it when given a path
+
+    Memory mapping means the file is paged in as it is read, rather than being read into
+    an array that is then copied again. Older cache files holding an object array of
+    polycubes cannot be memory mapped, and are loaded in full.
+
+    Parameters:
+    file (str or file): the cache file to read
+
+    Returns:
+    np.ndarray: the array stored in the cache
+
+    """
+    if isinstance(file, (str, os.PathLike)):
+        try:
+            return np.load(file, mmap_mode='r')
+        except ValueError:
+            pass
+    return np.load(file, allow_pickle=True)
+
+
+def load_ids(file) -> list[bytes]:
+    """
+    Reads the ids of the polycubes stored in a cache file
+
+    Cache files hold a flat byte array of the packed polycube ids joined end to end.
+    Older cache files holding an object array of polycubes are also accepted.
+
+    Parameters:
+    file (str or file): the cache file to read
+
+    Returns:
+    list[bytes]: the ids of the polycubes from the cache
+
+    """
+    data = load_array(file)
+    if data.dtype == object:
+        return [pack(polycube) for polycube in data]
+    return split_ids(data.tobytes())
+
+
 def get_cache_raw(cache_path: str) -> list[np.ndarray]:
     """
     Loads a Cache File for a given pathname
@@ -32,13 +76,33 @@ def get_cache_raw(cache_path: str) -> list[np.ndarray]:
     """
     if os.path.exists(cache_path):
 
-        polycubes = np.load(cache_path, allow_pickle=True)
+        polycubes = load_array(cache_path)
+        if polycubes.dtype != object:
+            polycubes = unpack_many(split_ids(polycubes.tobytes()))
 
         return polycubes
     else:
         return None
 
 
+def get_cache_ids(n: int) -> list[bytes]:
+    """
+    Loads the ids in a Cache File for a given size of polycube
+
+    Parameters:
+    n (int): the size of polycube to load the cache of
+
+    Returns:
+    list[bytes]: the ids of the polycubes of that size from the cache
+
+    """
+    cache_path = cache_path_fstring.format(n)
+    print(f"\rLoading polycubes n={n} from cache: ", end="")
+    cube_ids = load_ids(cache_path)
+    print(f"{len(cube_ids)} shapes")
+    return cube_ids
+
+
 def get_cache(n: int) -> np.ndarray:
     """
     Loads a Cache File for a given size of polycube
@@ -57,6 +121,17 @@ def get_cache(n: int) -> np.ndarray:
     return polycubes
 
 
+def save_ids(file, cube_ids: list[bytes]) -> None:
+    """
+    Writes polycube ids to a cache file as a single flat byte array, so no pickling is needed
+
+    Parameters:
+    file (str or file): the cache file to write
+    cube_ids (list[bytes]): the ids of the polycubes to be cached
+    """
+    np.save(file, np.frombuffer(b''.join(cube_ids), dtype=np.uint8), allow_pickle=False)
+
+
 def save_cache_raw(cache_path: str, polycubes: list[np.ndarray]) -> None:
     """
     Saves a Cache File to a file at a given pathname
@@ -65,7 +140,20 @@ def save_cache_raw(cache_path: str, polycubes: list[np.ndarray]) -> None:
     cache_path (str): the file location to sabe the cache file
     polycubes (list[np.ndarray]): the polycubes to be cached
     """
-    np.save(cache_path, np.array(polycubes, dtype=object), allow_pickle=True)
+    save_ids(cache_path, [pack(polycube) for polycube in polycubes])
+
+
+def save_cache_ids(n: int, cube_ids: list[bytes]) -> None:
+    """
+    Saves a Cache File for a given polycube size from the polycube ids
+
+    Parameters:
+    n (int): the size of the polycubes to be cached
+    cube_ids (list[bytes]): the ids of the polycubes to be cached
+    """
+    cache_path = cache_path_fstring.format(n)
+    save_ids(cache_path, cube_ids)
+    print(f"Wrote file for polycubes n={n}")
 
 
 def save_cache(n: int, polycubes: np.ndarray) -> None:
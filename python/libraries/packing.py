@@ -16,10 +16,8 @@ def pack(polycube: np.ndarray) -> bytes:
     cube_id (bytes): a bytes representation of the polycube
 
     """
-    data =  polycube.shape[0].to_bytes(1, 'little') \
-            + polycube.shape[1].to_bytes(1, 'little') \
-            + polycube.shape[2].to_bytes(1, 'little') \
-            + np.packbits(polycube.flatten(), bitorder='little').tobytes()
+    # every dimension is below 256, so the shape packs as one byte per axis
+    data = bytes(polycube.shape) + np.packbits(polycube.ravel(), bitorder='little').tobytes()
     return data
 
 
@@ -38,6 +36,86 @@ def unpack(cube_id: bytes) -> np.ndarray:
     # Extract shape information
     shape = (cube_id[0], cube_id[1], cube_id[2])
     size = shape[0] * shape[1] * shape[2]
-    polycube = np.unpackbits(np.frombuffer(cube_id[3:], dtype=np.uint8), count=size, bitorder='little').reshape(shape)
+    # read the bits in place rather than slicing (and so copying) the id
+    polycube = np.unpackbits(np.frombuffer(cube_id, dtype=np.uint8, offset=3), count=size, bitorder='little').reshape(shape)
     return polycube
 
+
+def split_ids(data: bytes) -> list[bytes]:
+    """
+    Splits a run of concatenated ids back into the individual ids.
+
+    Every id starts with the shape of its polycube, which gives the length of the id,
+    so concatenated ids need no separators.
+
+    Parameters:
+    data (bytes): ids joined end to end
+
+    Returns:
+    cube_ids (list[bytes]): the individual ids
+
+    """
+    cube_ids = []
+    offset = 0
+    while offset < len(data):
+        size = 3 + -(-(data[offset] * data[offset + 1] * data[offset + 2]) // 8)
+        cube_ids.append(data[offset:offset + size])
+        offset += size
+    return cube_ids
+
+
+def unpack_many(cube_ids: list[bytes]) -> list[np.ndarray]:
+    """
+    Converts many bytes objects back into 3D ndarrays, producing the same
+    polycubes as calling unpack on each id.
+
+    Ids are grouped by shape, and each group is decoded with a single unpackbits
+    call into one array, which the returned polycubes are views of.
+
+    Parameters:
+    cube_ids (list[bytes]): unique bytes objects
+
+    Returns:
+    polycubes (list[np.array]): 3D Numpy byte arrays where 1 values indicate
+        cube positions, in the same order as the ids
+
+    """
+    groups = {}
+    for i, cube_id in enumerate(cube_ids):
+        groups.setdefault(cube_id[:3], []).append(i)
+
+    polycubes = [None] * len(cube_ids)
+    for header, indices in groups.items():
+        shape = tuple(header)
+        bits = np.frombuffer(b''.join(cube_ids[i][3:] for i in indices), dtype=np.uint8).reshape(len(indices), -1)
+        group = np.unpackbits(bits, axis=1, count=math.prod(shape), bitorder='little').reshape((-1,) + shape)
+        for i, polycube in zip(indices, group):
+            polycubes[i] = polycube
+    return polycubes
+
+
+PackingWeights: dict[int, np.ndarray] = {}
+
+
+def packing_weights(size: int) -> np.ndarray:
+    """
+    Calculates the weight of each cell of a flattened polycube in its packed id.
+
+    Multiplying the cells of a polycube by the weights and summing gives its packed bits
+    as big-endian 64 bit words, without packing the polycube first. Weights are cached
+    in PackingWeights by the number of cells.
+
+    Parameters:
+    size (int): the number of cells in the polycube
+
+    Returns:
+    np.array: (size, words) array of the weight of each cell in each word
+
+    """
+    if size not in PackingWeights:
+        cells = np.arange(size, dtype=np.uint64)
+        weights = np.zeros((size, -(-size // 64)), dtype=np.uint64)
+        # cell i is bit i % 8 of byte i // 8, and bytes fill each word from the top
+        weights[cells, cells // 64] = np.uint64(1) << (8 * (7 - cells // 8 % 8) + cells % 8)
+        PackingWeights[size] = weights
+    return PackingWeights[size]
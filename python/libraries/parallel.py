@@ -0,0 +1,55 @@
+import multiprocessing
+from functools import partial
+from typing import Callable, Generator, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def run_chunk(task_function: Callable[[list[T]], R], chunk: list[T]) -> tuple[int, R]:
+    """
+    Runs a task on one chunk of items, returning the chunk size alongside the result
+    so that progress can be counted when results arrive out of order.
+    """
+    return len(chunk), task_function(chunk)
+
+
+def dispatch_tasks(task_function: Callable[[list[T]], R], items: list[T],
+                   chunk_size: int = 256, ordered: bool = True,
+                   parallel: bool = True) -> Generator[tuple[int, R], None, None]:
+    """
+    Runs a task over chunks of items using a pool of worker processes.
+
+    Items are split into chunks of chunk_size, and each chunk is handed to one call of
+    task_function in a worker process. Chunks are kept small so that idle workers keep
+    picking up work until the end, rather than waiting on one slow chunk.
+    If all items fit in a single chunk the chunks are run in this process instead,
+    as starting the pool would cost more than the work.
+    The task function must be defined at module level so that it can be pickled.
+
+    Parameters:
+    task_function (function): the task to run, taking a list of items
+    items (list): the items to process
+    chunk_size (int): the number of items given to each task
+    ordered (bool): whether results must be yielded in the order of the items, otherwise
+        they are yielded as soon as each chunk finishes
+    parallel (bool): whether to use worker processes at all, otherwise every chunk is run in this process
+
+    Returns:
+    generator(tuple): Yields the number of items processed so far and the result of each chunk
+
+    """
+    # chunks are sliced off as they are needed, rather than holding a second copy of every item
+    chunks = (items[i:i + chunk_size] for i in range(0, len(items), chunk_size))
+    done = 0
+    if not parallel or len(items) <= chunk_size:
+        for chunk in chunks:
+            done += len(chunk)
+            yield done, task_function(chunk)
+        return
+
+    with multiprocessing.Pool() as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for size, result in imap(partial(run_chunk, task_function), chunks):
+            done += size
+            yield done, result
@@ -2,10 +2,19 @@ from enum import Enum
 from io import IOBase
 from dataclasses import dataclass
 from typing import Generator
-import leb128
 import math
-from io import BytesIO
-import gzip
+from io import BytesIO, BufferedWriter
+
+try:
+    # ISA-L deflates several times faster than zlib, and writes the same gzip format
+    from isal import igzip as gzip, igzip_threaded
+    gzip_compresslevel = 2
+    gzip_max_compresslevel = 3
+except ImportError:
+    import gzip
+    igzip_threaded = None
+    gzip_compresslevel = 5
+    gzip_max_compresslevel = 9
 
 magic_string = bytes.fromhex('CBECCBEC')
 
@@ -22,23 +31,53 @@ class Polycubes():
     orientation: Orientation
     polycubes: list[bytes]
 
+write_buffer_size = 128 * 1024
+
 vlq_num_mask = 0b01111111
 vlq_continue_mask = 1<<7
 
 def vlq_is_complete(byte) -> bool:
-    return (byte | vlq_continue_mask)
+    return not (byte & vlq_continue_mask)
+
+def encode_vlq(value: int) -> bytes:
+    encoded = bytearray()
+    while value > vlq_num_mask:
+        encoded.append((value & vlq_num_mask) | vlq_continue_mask)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
 
-def write(fp: IOBase, orientation: Orientation, polycubes: list[bytes], compression: Compression = Compression.NO_COMPRESSION) -> None:
+def read_vlq(fp: IOBase) -> int:
+    value = 0
+    shift = 0
+    while True:
+        byte = fp.read(1)[0]
+        value |= (byte & vlq_num_mask) << shift
+        if vlq_is_complete(byte):
+            return value
+        shift += 7
+
+def write(fp: IOBase, orientation: Orientation, polycubes: list[bytes], compression: Compression = Compression.NO_COMPRESSION,
+          compresslevel: int = gzip_compresslevel, threads: int = 1) -> None:
     header = magic_string
     header += int(orientation.value).to_bytes(1, 'little')
     header += int(compression.value).to_bytes(1, 'little')
-    header += leb128.u.encode(len(polycubes))
+    header += encode_vlq(len(polycubes))
     fp.write(header)
     if(compression == Compression.GZIP_COMPRESSION):
-        total_data = bytearray()
-        for polycube in polycubes:
-            total_data.extend(polycube)
-        fp.write(gzip.compress(total_data, 5))
+        # stream the polycubes through a large buffer, so deflate sees big blocks
+        # without a joined copy of every polycube being made first
+        # isal only has levels 0 to 3, so higher levels use its best
+        compresslevel = min(compresslevel, gzip_max_compresslevel)
+        if threads > 1 and igzip_threaded is not None:
+            # isal can deflate blocks of the stream on several threads at once
+            with igzip_threaded.open(fp, 'wb', compresslevel=compresslevel, threads=threads,
+                                     block_size=write_buffer_size) as buffered:
+                buffered.writelines(polycubes)
+        else:
+            with gzip.GzipFile(fileobj=fp, mode='wb', compresslevel=compresslevel) as gz:
+                with BufferedWriter(gz, buffer_size=write_buffer_size) as buffered:
+                    buffered.writelines(polycubes)
     else:
         for polycube in polycubes:
             fp.write(polycube)
@@ -68,13 +107,12 @@ def read(fp: IOBase, ignore_orientation:bool = False) -> Polycubes:
         raise ValueError("provided file uses unsuported compression")
     compression = Compression(compression)
     
-    n_cubes, read = leb128.u.decode_reader(fp)
+    n_cubes = read_vlq(fp)
 
     use_fp = fp
     if (compression == Compression.GZIP_COMPRESSION):
-        use_fp = BytesIO()
-        use_fp.write(gzip.decompress(fp.read()))
-        use_fp.seek(0)
+        # BytesIO shares the decompressed bytes rather than copying them in
+        use_fp = BytesIO(gzip.decompress(fp.read()))
 
     cubes = []
 
@@ -1,25 +1,78 @@
 import math
 import numpy as np
-import matplotlib.pyplot as plt
+from typing import Generator
 
 # # Code for if you want to generate pictures of the sets of cubes. Will work up to about n=8, before there are simply too many!
 # # Could be adapted for larger cube sizes by splitting the dataset up into separate images.
+# # For larger n, render_mesh writes the same layout as a mesh file to open in a 3D viewer instead.
 
+# the number of polycubes whose faces are found at once when writing a mesh file
+mesh_chunk_size = 4096
 
-def render_shapes(shapes: list[np.ndarray], path: str):
-    n = len(shapes)
-    dim = max(max(a.shape) for a in shapes)
-    i = math.isqrt(n) + 1
-    voxel_dim = dim * i
-    voxel_array = np.zeros((voxel_dim + i, voxel_dim + i, dim), dtype=np.byte)
-    pad = 1
+
+def stack_shapes(shapes: list[np.ndarray], cell_shape: tuple[int, ...]) -> np.ndarray:
+    """
+    Stacks polycubes into one array, each in the corner of a cell of the same shape.
+
+    Polycubes of the same shape are written into their cells together.
+
+    Parameters:
+    shapes (list[np.array]): 3D Numpy byte arrays where 1 values indicate polycube positions
+    cell_shape (tuple): the shape of each cell, which every polycube must fit
+
+    Returns:
+    np.array: (k, x, y, z) Numpy byte array holding every polycube
+
+    """
+    by_shape = {}
     for idx, shape in enumerate(shapes):
-        x = (idx % i) * dim + (idx % i)
-        y = (idx // i) * dim + (idx // i)
-        xpad = x * pad
-        ypad = y * pad
-        s = shape.shape
-        voxel_array[x:x + s[0], y:y + s[1], 0: s[2]] = shape
+        by_shape.setdefault(shape.shape, []).append(idx)
+    cells = np.zeros((len(shapes),) + cell_shape, dtype=np.byte)
+    for (x, y, z), indexes in by_shape.items():
+        cells[indexes, :x, :y, :z] = np.stack([shapes[idx] for idx in indexes])
+    return cells
+
+
+def grid_size(shapes: list[np.ndarray]) -> tuple[int, int]:
+    """
+    Sizes the square grid that polycubes are laid out on.
+
+    Parameters:
+    shapes (list[np.array]): 3D Numpy byte arrays where 1 values indicate polycube positions
+
+    Returns:
+    dim (int): the largest dimension of any polycube
+    i (int): the number of polycubes along each side of the grid
+
+    """
+    return max(max(a.shape) for a in shapes), math.isqrt(len(shapes)) + 1
+
+
+def arrange_shapes(shapes: list[np.ndarray]) -> np.ndarray:
+    """
+    Lays out polycubes side by side on a square grid, with a gap between each.
+
+    Parameters:
+    shapes (list[np.array]): 3D Numpy byte arrays where 1 values indicate polycube positions
+
+    Returns:
+    np.array: 3D Numpy byte array holding every polycube
+
+    """
+    dim, i = grid_size(shapes)
+
+    # each polycube gets a cell with a one block gap after it in x and y, and the cells
+    # are tiled into the grid in one reshape, with polycube idx at row idx // i, column idx % i
+    cells = np.zeros((i * i, dim + 1, dim + 1, dim), dtype=np.byte)
+    cells[:len(shapes)] = stack_shapes(shapes, (dim + 1, dim + 1, dim))
+    cells = cells.reshape(i, i, dim + 1, dim + 1, dim).transpose(1, 2, 0, 3, 4)
+    return cells.reshape(i * (dim + 1), i * (dim + 1), dim)
+
+
+def render_shapes(shapes: list[np.ndarray], path: str):
+    import matplotlib.pyplot as plt
+
+    voxel_array = arrange_shapes(shapes)
 
     # voxel_array = crop_cube(voxel_array)
     colors = np.empty(voxel_array.shape, dtype=object)
@@ -34,3 +87,143 @@ def render_shapes(shapes: list[np.ndarray], path: str):
     plt.axis("off")
     ax.set_box_aspect((1, 1, voxel_array.shape[2] / voxel_array.shape[0]))
     plt.savefig(path + ".png", bbox_inches='tight', pad_inches=0)
+
+
+def exposed_faces(polycubes: np.ndarray) -> Generator[tuple[int, int, np.ndarray], None, None]:
+    """
+    Finds the blocks of a batch of polycubes whose face in each direction is exterior.
+
+    A face is exterior when the neighbouring voxel across it is empty or outside the polycube,
+    so faces shared by two blocks are left out.
+
+    Parameters:
+    polycubes (np.array): (k, x, y, z) Numpy byte array where 1 values indicate polycube positions
+
+    Returns:
+    generator(tuple): Yields the axis and step (1 or -1) of the face normal, and a (k, x, y, z)
+        mask of the blocks with that face exterior
+
+    """
+    size = polycubes.shape[1:]
+    filled = np.zeros(polycubes.shape[:1] + tuple(length + 2 for length in size), dtype=bool)
+    filled[:, 1:-1, 1:-1, 1:-1] = polycubes
+    region = [slice(None)] + [slice(1, 1 + length) for length in size]
+    for axis in range(3):
+        for step in (1, -1):
+            # the blocks, and their neighbours one step along axis
+            neighbours = list(region)
+            neighbours[axis + 1] = slice(1 + step, 1 + step + size[axis])
+            yield axis, step, filled[tuple(region)] & ~filled[tuple(neighbours)]
+
+
+def face_corners(axis: int, step: int, exposed: np.ndarray, origins: np.ndarray) -> np.ndarray:
+    """
+    Builds the corners of the faces found by exposed_faces.
+
+    Parameters:
+    axis (int): the axis of the face normal
+    step (int): 1 for faces on the positive side of each block, -1 for the negative side
+    exposed (np.array): (k, x, y, z) mask of the blocks with that face exterior
+    origins (np.array): (k, 3) float32 array of the position of each polycube
+
+    Returns:
+    np.array: (4 * faces, 3) float32 array of vertex positions, four per face, counter-clockwise
+        when seen from outside
+
+    """
+    # the corners of a unit square in the plane of the two axes after the face normal,
+    # in counter-clockwise order when seen from the positive side
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+    face = np.zeros((4, 3), dtype=np.float32)
+    face[:, axis] = step > 0
+    face[:, [(axis + 1) % 3, (axis + 2) % 3]] = square if step > 0 else square[::-1]
+
+    polycube, *position = np.nonzero(exposed)
+    blocks = np.stack(position, axis=1).astype(np.float32) + origins[polycube]
+    return (blocks[:, np.newaxis, :] + face).reshape(-1, 3)
+
+
+def face_triangles(first: int, count: int) -> np.ndarray:
+    """
+    Builds the two triangles of each of a run of faces, whose corners are stored four per face.
+
+    Parameters:
+    first (int): the index of the first face
+    count (int): the number of faces
+
+    Returns:
+    np.array: (2 * count, 3) int32 array of vertex indices
+    """
+    corners = np.arange(4 * first, 4 * (first + count), 4, dtype=np.int32)[:, np.newaxis, np.newaxis]
+    return (corners + np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int32)).reshape(-1, 3)
+
+
+def exterior_faces(polycube: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds a triangle mesh of the exterior faces of a polycube.
+
+    Parameters:
+    polycube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
+
+    Returns:
+    vertices (np.array): (v, 3) float32 array of vertex positions
+    triangles (np.array): (t, 3) int32 array of vertex indices, wound to face outwards
+
+    """
+    origin = np.zeros((1, 3), dtype=np.float32)
+    vertices = np.concatenate([face_corners(axis, step, exposed, origin)
+                               for axis, step, exposed in exposed_faces(polycube[np.newaxis])])
+    return vertices, face_triangles(0, len(vertices) // 4)
+
+
+def render_mesh(shapes: list[np.ndarray], path: str):
+    """
+    Writes polycubes to a binary PLY mesh file, laid out as in render_shapes.
+
+    Only the exterior faces of each polycube are written, with no per voxel work in python.
+    The gaps between polycubes in the layout mean each polycube's faces can be found on its own,
+    so the polycubes are worked through in chunks, placed straight at their positions in the grid,
+    and the layout itself is never built. The faces are counted first, as the file header
+    needs the total, then written a chunk at a time.
+
+    Parameters:
+    shapes (list[np.array]): 3D Numpy byte arrays where 1 values indicate polycube positions
+    path (str): the path to write to, without the .ply extension
+
+    """
+    dim, i = grid_size(shapes)
+
+    def chunks():
+        for first in range(0, len(shapes), mesh_chunk_size):
+            chunk = shapes[first:first + mesh_chunk_size]
+            idx = np.arange(first, first + len(chunk))
+            origins = np.stack([(idx % i) * (dim + 1), (idx // i) * (dim + 1), np.zeros_like(idx)], axis=1)
+            yield stack_shapes(chunk, (dim,) * 3), origins.astype(np.float32)
+
+    faces = sum(int(exposed.sum()) for polycubes, _ in chunks() for _, _, exposed in exposed_faces(polycubes))
+
+    header = "\n".join([
+        "ply",
+        "format binary_little_endian 1.0",
+        f"element vertex {4 * faces}",
+        "property float x",
+        "property float y",
+        "property float z",
+        f"element face {2 * faces}",
+        "property list uchar int vertex_indices",
+        "end_header",
+    ]) + "\n"
+    face_dtype = np.dtype([('count', 'u1'), ('indexes', '<i4', (3,))])
+    with open(path + ".ply", "wb") as fp:
+        fp.write(header.encode("ascii"))
+        for polycubes, origins in chunks():
+            for axis, step, exposed in exposed_faces(polycubes):
+                fp.write(face_corners(axis, step, exposed, origins).astype('<f4', copy=False).tobytes())
+        # each chunk of polycubes has far fewer faces than this, which keeps the writes large
+        triangle_chunk_size = 64 * mesh_chunk_size
+        for first in range(0, faces, triangle_chunk_size):
+            triangles = face_triangles(first, min(triangle_chunk_size, faces - first))
+            records = np.empty(len(triangles), dtype=face_dtype)
+            records['count'] = 3
+            records['indexes'] = triangles
+            fp.write(records.tobytes())
@@ -2,11 +2,28 @@ import numpy as np
 from typing import Generator
 
 
+def bounding_box(cube: np.ndarray) -> tuple[int, ...]:
+    """
+    Finds the extent of the non-zero region of an np.array in a single scan.
+
+    Parameters:
+    cube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
+
+    Returns:
+    tuple(int): the inclusive bounds (x0, x1, y0, y1, z0, z1) of the non-zero region
+
+    """
+    bounds = ()
+    for indices in cube.nonzero():
+        bounds += (indices.min(), indices.max())
+    return bounds
+
+
 def crop_cube(cube: np.ndarray) -> np.ndarray:
     """
     Crops an np.array to have no all-zero padding around the edge.
 
-    Given in https://stackoverflow.com/questions/39465812/how-to-crop-zero-edges-of-a-numpy-array
+    Returns a view into the original array rather than a copy.
 
     Parameters:
     cube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
@@ -15,20 +32,17 @@ def crop_cube(cube: np.ndarray) -> np.ndarray:
     np.array: Cropped 3D Numpy byte array equivalent to cube, but with no zero padding
 
     """
-    for i in range(cube.ndim):
-        cube = np.swapaxes(cube, 0, i)
-        nonzero_indices = np.any(cube != 0, axis=tuple(range(1, cube.ndim)))
-        cube = cube[nonzero_indices]
-        cube = np.swapaxes(cube, 0, i)
-    return cube
+    bounds = bounding_box(cube)
+    return cube[tuple(slice(low, high + 1) for low, high in zip(bounds[::2], bounds[1::2]))]
 
 
 def expand_cube(cube: np.ndarray) -> Generator[np.ndarray, None, None]:
     """
     Expands a polycube by adding single blocks at all valid locations.
 
-    Calculates all valid new positions of a polycube by shifting the existing cube +1 and -1 in each dimension.
-    New valid cubes are returned via a generator function, in case they are not all needed.
+    Calculates all valid new positions of a polycube as the face neighbours of its blocks that are not already filled.
+    New cubes are built in batches by expand_cube_batches, and returned one at a time
+    via a generator function, in case they are not all needed.
 
     Parameters:
     cube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
@@ -37,20 +51,76 @@ def expand_cube(cube: np.ndarray) -> Generator[np.ndarray, None, None]:
     generator(np.array): Yields new polycubes that are extensions of cube
 
     """
-    cube = np.pad(cube, 1, 'constant', constant_values=0)
-    output_cube = np.array(cube)
+    for batch in expand_cube_batches(cube):
+        yield from batch
+
+
+def expand_cube_batches(cube: np.ndarray) -> list[np.ndarray]:
+    """
+    Expands a polycube by adding single blocks at all valid locations, grouped by shape.
+
+    A new block either lies within the bounds of the polycube, or just outside them on one axis,
+    so every new polycube keeps the original shape or grows by one along a single axis.
+    Each of these groups is built directly as one cropped (k, x, y, z) array.
 
-    xs, ys, zs = cube.nonzero()
-    output_cube[xs+1, ys, zs] = 1
-    output_cube[xs-1, ys, zs] = 1
-    output_cube[xs, ys+1, zs] = 1
-    output_cube[xs, ys-1, zs] = 1
-    output_cube[xs, ys, zs+1] = 1
-    output_cube[xs, ys, zs-1] = 1
+    Parameters:
+    cube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
 
-    exp = (output_cube ^ cube).nonzero()
+    Returns:
+    list(np.array): Batches of new polycubes that are extensions of cube, one per shape
+
+    """
+    # positions are flat indexes into the cube padded by one block on every side
+    padded_shape = tuple(size + 2 for size in cube.shape)
+    occupied = np.zeros(padded_shape, dtype=bool)
+    occupied[1:-1, 1:-1, 1:-1] = cube
+    blocks = np.flatnonzero(occupied)
+
+    strides = np.array([padded_shape[1] * padded_shape[2], padded_shape[2], 1])
+    candidates = np.zeros(occupied.size, dtype=bool)
+    candidates[blocks[:, np.newaxis] + np.concatenate((strides, -strides))] = True
+    candidates[blocks] = False
+    # new block positions relative to the original cube
+    new_blocks = np.stack(np.unravel_index(np.flatnonzero(candidates), padded_shape), axis=1) - 1
+    outside = (new_blocks < 0) | (new_blocks >= cube.shape)
+
+    batches = []
+    inside = ~outside.any(axis=1)
+    if inside.any():
+        batches.append(add_blocks(cube, cube.shape, new_blocks[inside], np.zeros(inside.sum(), dtype=bool), 0))
+    for axis in range(cube.ndim):
+        grown = outside[:, axis]
+        if grown.any():
+            shape = tuple(size + (i == axis) for i, size in enumerate(cube.shape))
+            batches.append(add_blocks(cube, shape, new_blocks[grown], new_blocks[grown, axis] < 0, axis))
+    return batches
+
+
+def add_blocks(cube: np.ndarray, shape: tuple[int, ...], new_blocks: np.ndarray,
+               shifted: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Builds a batch of copies of a polycube, each with one block added.
+
+    Parameters:
+    cube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
+    shape (tuple): the shape of the new polycubes
+    new_blocks (np.array): (k, 3) positions of the added blocks, relative to the original cube
+    shifted (np.array): for each new polycube, whether the block was added before the start of axis,
+        moving the original cube along by one
+    axis (int): the axis that shifted applies to
+
+    Returns:
+    np.array: (k, x, y, z) array of the new polycubes
+
+    """
+    batch = np.zeros((len(new_blocks),) + shape, dtype=cube.dtype)
+    origin = [slice(0, size) for size in cube.shape]
+    batch[(~shifted,) + tuple(origin)] = cube
+    if shifted.any():
+        origin[axis] = slice(1, cube.shape[axis] + 1)
+        batch[(shifted,) + tuple(origin)] = cube
 
-    for (x, y, z) in zip(exp[0], exp[1], exp[2]):
-        new_cube = np.array(cube)
-        new_cube[x, y, z] = 1
-        yield crop_cube(new_cube)
+    positions = new_blocks.copy()
+    positions[:, axis] += shifted
+    batch[(np.arange(len(new_blocks)),) + tuple(positions.T)] = 1
+    return batch
@@ -1,3 +1,4 @@
+import itertools
 import numpy as np
 from typing import Generator
 
@@ -6,9 +7,28 @@ def all_rotations(polycube: np.ndarray) -> Generator[np.ndarray, None, None]:
     """
     Calculates all rotations of a polycube.
 
+    All 24 rotations are gathered at once with the cached index table for the shape of the
+    polycube, see all_rotations_fast, and are yielded one at a time in their rotated shapes.
+
+    Parameters:
+    polycube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
+
+    Returns:
+    generator(np.array): Yields new rotations of this cube about all axes
+
+    """
+    rotations, shapes = all_rotations_fast(polycube)
+    for rotation, shape in zip(rotations, shapes):
+        yield rotation.reshape(shape)
+
+
+def rot90_rotations(polycube: np.ndarray) -> Generator[np.ndarray, None, None]:
+    """
+    Calculates all rotations of a polycube with rot90.
+
     Adapted from https://stackoverflow.com/questions/33190042/how-to-calculate-all-24-rotations-of-3d-array.
     This function computes all 24 rotations around each of the axis x,y,z. It uses numpy operations to do this, to avoid unecessary copies.
-    The function returns a generator, to avoid computing all rotations if they are not needed.
+    It is used to build the rotation index tables, which all other rotations are gathered with.
 
     Parameters:
     polycube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
@@ -36,3 +56,88 @@ def all_rotations(polycube: np.ndarray) -> Generator[np.ndarray, None, None]:
     # rotate about axis 2, 8 rotations about axis 1
     yield from single_axis_rotation(np.rot90(polycube, axes=(0, 1)), (0, 2))
     yield from single_axis_rotation(np.rot90(polycube, -1, axes=(0, 1)), (0, 2))
+
+
+RotationIndexes: dict[tuple[int, ...], tuple[np.ndarray, list[tuple[int, ...]]]] = {}
+CanonicalRotationIndexes: dict[tuple[int, ...], tuple[np.ndarray, list[tuple[int, ...]]]] = {}
+
+
+def rotation_indexes(shape: tuple[int, ...]) -> tuple[np.ndarray, list[tuple[int, ...]]]:
+    """
+    Calculates index tables that gather all 24 rotations of a polycube of a given shape.
+
+    The tables are built once per shape by rotating a probe array of flat indices, and are
+    cached in RotationIndexes. Indexing a flattened polycube with the table produces every
+    rotation in a single numpy operation, rather than 24 separate rot90 calls.
+
+    Parameters:
+    shape (tuple): the shape of the polycubes to rotate
+
+    Returns:
+    indexes (np.array): (24, size) array, row i holds the flat indices of rotation i
+    shapes (list[tuple]): the shape of each rotation
+
+    """
+    if shape not in RotationIndexes:
+        probe = np.arange(np.prod(shape)).reshape(shape)
+        rotations = list(rot90_rotations(probe))
+        indexes = np.stack([rotation.ravel() for rotation in rotations])
+        RotationIndexes[shape] = (indexes, [rotation.shape for rotation in rotations])
+    return RotationIndexes[shape]
+
+
+def all_rotations_fast(polycube: np.ndarray) -> tuple[np.ndarray, list[tuple[int, ...]]]:
+    """
+    Calculates all rotations of a polycube with a single gather.
+
+    Parameters:
+    polycube (np.array): 3D Numpy byte array where 1 values indicate polycube positions
+
+    Returns:
+    rotations (np.array): (24, size) array, row i holds rotation i flattened in C order
+    shapes (list[tuple]): the shape of each rotation
+
+    """
+    indexes, shapes = rotation_indexes(polycube.shape)
+    return polycube.ravel()[indexes], shapes
+
+
+def canonical_rotation_indexes(shape: tuple[int, ...]) -> tuple[np.ndarray, list[tuple[int, ...]]]:
+    """
+    Calculates index tables for only the rotations of a given shape that can hold the canonical id.
+
+    Packed ids begin with the shape, so the maximum id is always found among the rotations with
+    the lexicographically largest shape. That is 4 rotations when all dimensions differ,
+    8 when two are equal, and all 24 only when the polycube fits a cube.
+
+    Parameters:
+    shape (tuple): the shape of the polycubes to rotate
+
+    Returns:
+    indexes (np.array): (k, size) array, row i holds the flat indices of rotation i
+    shapes (list[tuple]): the shape of each rotation
+
+    """
+    if shape not in CanonicalRotationIndexes:
+        indexes, shapes = rotation_indexes(shape)
+        largest = max(shapes)
+        keep = [i for i, rotation_shape in enumerate(shapes) if rotation_shape == largest]
+        CanonicalRotationIndexes[shape] = (indexes[keep], [largest] * len(keep))
+    return CanonicalRotationIndexes[shape]
+
+
+def precompute_rotation_indexes(n: int) -> None:
+    """
+    Builds the canonical rotation index tables for every shape a polycube of size n can have.
+
+    A polycube of n connected cubes spans at most n + 2 along its three dimensions together,
+    which leaves only a few hundred shapes for n up to 12. Building the tables before the
+    polycubes are hashed means forked worker processes inherit them rather than each building its own.
+
+    Parameters:
+    n (int): the size of the polycubes that will be rotated
+
+    """
+    for shape in itertools.product(range(1, n + 1), repeat=3):
+        if sum(shape) <= n + 2:
+            canonical_rotation_indexes(shape)
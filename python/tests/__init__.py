@@ -1,4 +1,7 @@
 from . import test_cache
 from . import test_packing
 from . import test_resizing
-from . import test_rotation
\ No newline at end of file
+from . import test_rotation
+from . import test_parallel
+from . import test_renderer
+from . import test_cubes
\ No newline at end of file
@@ -1,22 +1,40 @@
 import unittest
 import os
-from libraries.cache import get_cache, save_cache
+from libraries.cache import get_cache, get_cache_ids, save_cache, save_cache_ids, load_ids
+from libraries.packing import pack
 from numpy.testing import assert_array_equal
 from .utils import get_test_data
 
+# named per process, so that test runners working in parallel do not share the file
+cache_name = f"test_temp_{os.getpid()}"
+
 class CachingTests(unittest.TestCase):
 
     def test_cache_consistency(self):
         test_data = get_test_data()
         
-        save_cache("test_temp", test_data)
-        reloaded_data = get_cache("test_temp")
+        save_cache(cache_name, test_data)
+        reloaded_data = get_cache(cache_name)
         
         for test, reloaded in zip(test_data, reloaded_data):
             assert_array_equal(test, reloaded)
 
+    def test_cache_ids_consistency(self):
+        test_ids = [pack(polycube) for polycube in get_test_data()]
+
+        save_cache_ids(cache_name, test_ids)
+        reloaded_ids = get_cache_ids(cache_name)
+
+        self.assertEqual(test_ids, reloaded_ids, "cached ids do not match")
+
+    def test_load_legacy_cache(self):
+        # the test data is stored as an object array of polycubes, as older caches were
+        expected_ids = [pack(polycube) for polycube in get_test_data()]
+
+        self.assertEqual(load_ids('./tests/test_data.npy'), expected_ids, "ids loaded from a legacy cache do not match")
+
     @classmethod
     def tearDownClass(cls):
-        expected_test_file_name = "cubes_test_temp.npy"
+        expected_test_file_name = f"cubes_{cache_name}.npy"
         if os.path.exists(expected_test_file_name):
             os.remove(expected_test_file_name)
\ No newline at end of file
@@ -0,0 +1,62 @@
+import unittest
+import io
+import contextlib
+import numpy as np
+from cubes import generate_polycubes, get_canonical_bits, get_canonical_packings, get_canonical_packing
+from libraries.rotation import all_rotations
+from libraries.packing import pack
+from .utils import get_test_data
+
+
+def get_tied_data():
+    # cubes symmetric under several rotations except in their last cells, so their
+    # rotations tie on every word but the last
+    rng = np.random.default_rng(0)
+    polycubes = []
+    for _ in range(100):
+        polycube = rng.integers(0, 2, (5, 5, 5), dtype=np.uint8)
+        polycube = polycube | polycube[:, ::-1, ::-1] | polycube[:, ::-1, :] | polycube[:, :, ::-1]
+        polycube.reshape(-1)[-6:] = rng.integers(0, 2, 6)
+        polycubes.append(polycube)
+    return polycubes
+
+
+def max_rotation_id(polycube):
+    return max(pack(rotation) for rotation in all_rotations(polycube))
+
+
+class CanonicalTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_data = list(get_test_data()) + get_tied_data()
+        cls.expected = [max_rotation_id(polycube.astype(np.uint8)) for polycube in cls.test_data]
+
+    def test_canonical_packing_is_max_rotation(self):
+        for dtype in (np.uint8, np.int8, bool):
+            for polycube, expected in zip(self.test_data, self.expected):
+                self.assertEqual(get_canonical_packing(polycube.astype(dtype)), expected,
+                                 f"canonical id of {dtype.__name__} polycube {polycube} is not its max rotation")
+
+    def test_canonical_batches_match(self):
+        by_shape = {}
+        for polycube, expected in zip(self.test_data, self.expected):
+            by_shape.setdefault(polycube.shape, []).append((polycube, expected))
+        for dtype in (np.uint8, np.int8, bool):
+            for cubes in by_shape.values():
+                batch = np.stack([polycube for polycube, _ in cubes]).astype(dtype)
+                expected = [expected for _, expected in cubes]
+                self.assertEqual(get_canonical_packings(batch), expected, "batched canonical ids do not match")
+                self.assertEqual(get_canonical_bits(batch), [cube_id[3:] for cube_id in expected],
+                                 "canonical bits do not match the canonical ids")
+
+
+class GenerationTests(unittest.TestCase):
+    # up to n=8, where there are enough base polycubes for the hashing to use worker processes
+    expected_counts = [1, 1, 2, 8, 29, 166, 1023, 6922]
+
+    def test_generate_counts(self):
+        for parallel in (False, True):
+            for n, expected in enumerate(self.expected_counts, start=1):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    polycubes = generate_polycubes(n, use_cache=False, parallel=parallel)
+                self.assertEqual(len(polycubes), expected, f"wrong number of polycubes of size {n} with parallel={parallel}")
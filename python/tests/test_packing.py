@@ -1,52 +1,68 @@
 import unittest
+from collections import Counter
+import numpy as np
 from numpy.testing import assert_array_equal
-from libraries.packing import pack, unpack
+from libraries.packing import pack, unpack, unpack_many, split_ids, packing_weights
+from libraries.rotation import all_rotations
+from cubes import get_canonical_bits
 from .utils import get_test_data
 
 class PackingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_data = get_test_data()
+        cls.packed = [pack(polycube) for polycube in cls.test_data]
+
     def test_pack_does_not_throw(self):
-        test_data = get_test_data()
-        for polycube in test_data:
+        for polycube in self.test_data:
             try:
                 packed = pack(polycube)
             except:
                 self.fail(f"pack threw on pollycube {polycube}")
 
     def test_unpack_does_not_throw(self):
-        test_data = get_test_data()
-        for polycube in test_data:
-            packed = pack(polycube)
+        for polycube, packed in zip(self.test_data, self.packed):
             try:
                 unpacked = unpack(packed)
             except:
                 self.fail(f"unpack threw on packing {packed} for pollycube {polycube}")
 
     def test_pack_hashable(self):
-        test_data = get_test_data()
-        for polycube in test_data:
-            packed = pack(polycube)
+        for polycube, packed in zip(self.test_data, self.packed):
             try:
                 hash(packed)
             except:
                 self.fail(f"packing of pollycube {polycube} isnt hashable")
 
     def test_pack_equitable(self):
-        test_data = get_test_data()
-        for polycube in test_data:
-            packed = pack(polycube)
-            self.assertEqual(packed, packed, "hash does not equal itself")
+        # packing again gives a separate object, which must still compare equal
+        self.assertEqual([pack(polycube) for polycube in self.test_data], self.packed, "hash does not equal itself")
 
     def test_pack_unique(self):
-        test_data = get_test_data()
-        seen = set()
-        for polycube in test_data:
-            packed = pack(polycube)
-            self.assertNotIn(packed, seen)
-            seen.add(packed)
+        counts = Counter(self.packed)
+        self.assertEqual(len(counts), len(self.packed), f"pack produced duplicate ids {counts.most_common(1)}")
 
     def test_pack_symetric(self):
-        test_data = get_test_data()
-        for polycube in test_data:
-            packed = pack(polycube)
+        for polycube, packed in zip(self.test_data, self.packed):
             unpacked = unpack(packed)
-            assert_array_equal(polycube, unpacked, f"packing of polycube isnt symetric, unpacked polycube {polycube} packed to {packed} which unpacked to {unpacked}")
\ No newline at end of file
+            assert_array_equal(polycube, unpacked, f"packing of polycube isnt symetric, unpacked polycube {polycube} packed to {packed} which unpacked to {unpacked}")
+
+    def test_canonical_bits_match_pack(self):
+        for polycube in self.test_data:
+            rotations = {pack(rotation)[3:] for rotation in all_rotations(polycube)}
+            self.assertIn(get_canonical_bits([polycube])[0], rotations, "canonical bits are not packed as pack packs a rotation")
+
+    def test_split_ids(self):
+        self.assertEqual(split_ids(b''.join(self.packed)), self.packed, "split_ids did not recover the joined ids")
+
+    def test_unpack_many_matches_unpack(self):
+        for polycube, unpacked in zip(self.test_data, unpack_many(self.packed)):
+            assert_array_equal(polycube, unpacked, "unpack_many does not match unpack")
+
+    def test_packing_weights_match_pack(self):
+        test_data = list(self.test_data) + [np.random.default_rng(0).integers(0, 2, (5, 5, 5), dtype=np.uint8)]
+        for polycube in test_data:
+            bits = pack(polycube)[3:]
+            words = np.frombuffer(bits + bytes(-len(bits) % 8), dtype='>u8')
+            weighted = polycube.ravel().astype(np.uint64) @ packing_weights(polycube.size)
+            assert_array_equal(weighted, words, f"packing weights do not match pack for polycube {polycube}")
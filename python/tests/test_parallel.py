@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from numpy.testing import assert_array_equal
+from libraries.parallel import dispatch_tasks
+
+
+def reverse_ints_task(data):
+    return np.flip(data)
+
+
+class ParallelTests(unittest.TestCase):
+    def test_simple_paralel_task(self):
+        test_data = np.arange(2500)
+        results = list(dispatch_tasks(reverse_ints_task, test_data, chunk_size=1000))
+        self.assertEqual([done for done, _ in results], [1000, 2000, 2500])
+        for (_, result), expected in zip(results, [test_data[999::-1], test_data[1999:999:-1], test_data[:1999:-1]]):
+            assert_array_equal(result, expected)
+
+    def test_unordered_paralel_task(self):
+        test_data = np.arange(2500)
+        results = list(dispatch_tasks(reverse_ints_task, test_data, chunk_size=1000, ordered=False))
+        self.assertEqual(results[-1][0], 2500)
+        assert_array_equal(np.sort(np.concatenate([result for _, result in results])), test_data)
+
+    def test_single_chunk_task(self):
+        test_data = np.arange(10)
+        results = list(dispatch_tasks(reverse_ints_task, test_data))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], 10)
+        assert_array_equal(results[0][1], test_data[::-1])
+
+
+    def test_serial_task(self):
+        test_data = np.arange(2500)
+        results = list(dispatch_tasks(reverse_ints_task, test_data, chunk_size=1000, parallel=False))
+        self.assertEqual([done for done, _ in results], [1000, 2000, 2500])
+        assert_array_equal(np.concatenate([np.flip(result) for _, result in results]), test_data)
\ No newline at end of file
@@ -1,15 +1,19 @@
 import unittest
 from libraries.packing import pack
-from libraries.pcube import read, write, Orientation, Compression
+from libraries.pcube import read, write, encode_vlq, read_vlq, Orientation, Compression, igzip_threaded
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 from .utils import get_test_data
 
+# streams are kept in memory up to this size, and spill to disk past it
+spool_size = 4 * 1024 * 1024
+
 class PcubeTests(unittest.TestCase):
     def test_pcube_integrity(self):
         test_data = get_test_data()
         packed = [pack(cube) for cube in test_data]
         
-        with BytesIO() as pcube_stream:
+        with SpooledTemporaryFile(max_size=spool_size) as pcube_stream:
             write(pcube_stream, polycubes=packed, orientation=Orientation.UNSORTED, compression=Compression.NO_COMPRESSION)
             pcube_stream.seek(0)
             result = read(pcube_stream)
@@ -20,9 +24,27 @@ class PcubeTests(unittest.TestCase):
         test_data = get_test_data()
         packed = [pack(cube) for cube in test_data]
         
-        with BytesIO() as pcube_stream:
+        with SpooledTemporaryFile(max_size=spool_size) as pcube_stream:
             write(pcube_stream, polycubes=packed, orientation=Orientation.UNSORTED, compression=Compression.GZIP_COMPRESSION)
             pcube_stream.seek(0)
             result = read(pcube_stream)
         
-        self.assertEqual(packed, result.polycubes)
\ No newline at end of file
+        self.assertEqual(packed, result.polycubes)
+
+    @unittest.skipUnless(igzip_threaded is not None, "isal is not installed")
+    def test_pcube_threaded_integrity(self):
+        test_data = get_test_data()
+        packed = [pack(cube) for cube in test_data]
+        
+        with SpooledTemporaryFile(max_size=spool_size) as pcube_stream:
+            write(pcube_stream, polycubes=packed, orientation=Orientation.UNSORTED, compression=Compression.GZIP_COMPRESSION, threads=4)
+            pcube_stream.seek(0)
+            result = read(pcube_stream)
+        
+        self.assertEqual(packed, result.polycubes)
+
+    def test_vlq_matches_leb128(self):
+        encodings = {0: "00", 127: "7f", 128: "8001", 624485: "e58e26"}
+        for value, encoded in encodings.items():
+            self.assertEqual(encode_vlq(value), bytes.fromhex(encoded))
+            self.assertEqual(read_vlq(BytesIO(bytes.fromhex(encoded))), value)
@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from numpy.testing import assert_array_equal
+from libraries.renderer import arrange_shapes, exterior_faces, render_mesh
+from .utils import get_test_data
+
+class RendererTests(unittest.TestCase):
+    def test_arrange_keeps_every_block(self):
+        test_data = get_test_data()
+        self.assertEqual(arrange_shapes(test_data).sum(), sum(polycube.sum() for polycube in test_data), "arrange_shapes lost blocks")
+
+    def test_arrange_places_on_grid(self):
+        test_data = get_test_data()
+        voxel_array = arrange_shapes(test_data)
+        dim = max(max(polycube.shape) for polycube in test_data)
+        i = voxel_array.shape[0] // (dim + 1)
+        for idx, polycube in enumerate(test_data):
+            x = (idx % i) * (dim + 1)
+            y = (idx // i) * (dim + 1)
+            placed = voxel_array[x:x + polycube.shape[0], y:y + polycube.shape[1], :polycube.shape[2]]
+            assert_array_equal(placed, polycube, f"polycube {idx} is not at its grid position")
+
+    def test_exterior_faces_enclose_blocks(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            vertices, triangles = exterior_faces(polycube)
+            # the signed volume of a closed mesh wound outwards is the volume it encloses
+            a, b, c = (vertices[triangles[:, i]].astype(np.float64) for i in range(3))
+            volume = np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6
+            self.assertAlmostEqual(volume, polycube.sum(), msg=f"mesh does not enclose polycube {polycube}")
+
+    def test_render_mesh_matches_layout(self):
+        test_data = get_test_data()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mesh")
+            render_mesh(test_data, path)
+            with open(path + ".ply", "rb") as fp:
+                data = fp.read()
+        header, body = data.split(b"end_header\n", 1)
+        vertex_count = int(header.split(b"element vertex ")[1].split(b"\n")[0])
+        vertices = np.frombuffer(body, dtype='<f4', count=3 * vertex_count).reshape(-1, 3)
+        faces = np.frombuffer(body, dtype=[('count', 'u1'), ('indexes', '<i4', (3,))], offset=12 * vertex_count)
+        self.assertTrue((faces['count'] == 3).all(), "mesh faces are not all triangles")
+
+        # the mesh of each polycube placed on its own matches the mesh of the whole layout
+        expected_vertices, expected_triangles = exterior_faces(arrange_shapes(test_data))
+        def triangles(vertices, indexes):
+            return sorted(map(bytes, vertices[indexes].reshape(len(indexes), -1)))
+        self.assertEqual(triangles(vertices, faces['indexes']), triangles(expected_vertices, expected_triangles),
+                         "render_mesh does not match the faces of the layout")
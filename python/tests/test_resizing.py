@@ -1,9 +1,49 @@
 import unittest
 import os
+import numpy as np
+from numpy.testing import assert_array_equal
+from collections import Counter
 from libraries.resizing import crop_cube, expand_cube
+from libraries.packing import pack
 from .utils import get_test_data
 
+def expand_cube_reference(cube):
+    # the original expansion, which shifts the padded cube one step each way to find the new positions
+    cube = np.pad(cube, 1, 'constant', constant_values=0)
+    output_cube = np.array(cube)
+
+    xs, ys, zs = cube.nonzero()
+    output_cube[xs+1, ys, zs] = 1
+    output_cube[xs-1, ys, zs] = 1
+    output_cube[xs, ys+1, zs] = 1
+    output_cube[xs, ys-1, zs] = 1
+    output_cube[xs, ys, zs+1] = 1
+    output_cube[xs, ys, zs-1] = 1
+
+    exp = (output_cube ^ cube).nonzero()
+
+    for (x, y, z) in zip(exp[0], exp[1], exp[2]):
+        new_cube = np.array(cube)
+        new_cube[x, y, z] = 1
+        yield crop_cube(new_cube)
+
 class CroppingTests(unittest.TestCase):
-    #todo
-    # i am not smart enough to come up with helpful cropping tests right now.
-    pass
\ No newline at end of file
+    def test_crop_removes_padding(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            padded = np.pad(polycube, ((1, 2), (0, 3), (2, 0)))
+            assert_array_equal(crop_cube(padded), polycube, "crop_cube did not remove the zero padding")
+
+    def test_expand_adds_one_cube(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            for new_cube in expand_cube(polycube):
+                self.assertEqual(new_cube.sum(), polycube.sum() + 1, "expand_cube did not add exactly one cube")
+                self.assertEqual(new_cube.shape, crop_cube(new_cube).shape, "expand_cube produced an uncropped cube")
+
+    def test_expand_matches_reference(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            expanded = Counter(pack(new_cube) for new_cube in expand_cube(polycube))
+            expected = Counter(pack(new_cube) for new_cube in expand_cube_reference(polycube))
+            self.assertEqual(expanded, expected, f"expand_cube does not produce the same polycubes as shifting for {polycube}")
@@ -1,26 +1,52 @@
 import unittest
+import itertools
 import numpy as np
-from libraries.rotation import all_rotations
+from libraries.rotation import all_rotations, rot90_rotations, canonical_rotation_indexes, precompute_rotation_indexes, RotationIndexes, CanonicalRotationIndexes
+from libraries.packing import pack
+from cubes import get_canonical_bits
 from .utils import get_test_data
 
 class RotatingTests(unittest.TestCase):
+    def test_precompute_covers_shapes(self):
+        n = 5
+        saved = dict(RotationIndexes), dict(CanonicalRotationIndexes)
+        RotationIndexes.clear()
+        CanonicalRotationIndexes.clear()
+        try:
+            precompute_rotation_indexes(n)
+            expected = {shape for shape in itertools.product(range(1, n + 1), repeat=3) if sum(shape) <= n + 2}
+            self.assertEqual(set(CanonicalRotationIndexes), expected, "precompute_rotation_indexes did not build a table for every shape")
+        finally:
+            RotationIndexes.clear()
+            RotationIndexes.update(saved[0])
+            CanonicalRotationIndexes.clear()
+            CanonicalRotationIndexes.update(saved[1])
+
     def test_rotate_quantity(self):
         test_data = get_test_data()
         for polycube in test_data:
             rots = all_rotations(polycube)
             self.assertEqual(len(list(rots)), 24, "all_rotations failed to produce 24 rotations")
 
+    def test_rotate_matches_rot90(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            for rotation, expected in zip(all_rotations(polycube), rot90_rotations(polycube)):
+                np.testing.assert_array_equal(rotation, expected, "all_rotations disagrees with rot90_rotations")
+
+    def test_canonical_rotations_hold_max(self):
+        test_data = get_test_data()
+        for polycube in test_data:
+            expected = max(pack(rotation) for rotation in all_rotations(polycube))
+            _, shapes = canonical_rotation_indexes(polycube.shape)
+            self.assertEqual(bytes(shapes[0]) + get_canonical_bits([polycube])[0], expected, "canonical rotations missed the maximum id")
+
     def test_rotate_symetric(self):
         # tests that all rotations of any given rotation from an all rotations set, itself is in the all rotations set.
         # e.g. repeatedly rotating doesnt change the fundemental 24 rotations of a given polycube
         test_data = get_test_data()
         for polycube in test_data:
-            base_polycube_rotations = list(all_rotations(polycube))
-            for base_cube_rotation in base_polycube_rotations:
+            base_polycube_rotations = {pack(rotation) for rotation in all_rotations(polycube)}
+            for base_cube_rotation in all_rotations(polycube):
                 for rotated_cube_rotation in all_rotations(base_cube_rotation):
-                    found_match = False
-                    for inner_base_polycube_rotation in base_polycube_rotations:
-                        if np.array_equal(rotated_cube_rotation, inner_base_polycube_rotation):
-                            found_match = True
-                            break
-                    self.assertTrue(found_match, "rotation of a rotated polycube wasnt in the set of all rotations for the initial pollycube, rotating it twice has changed its shape")
\ No newline at end of file
+                    self.assertIn(pack(rotated_cube_rotation), base_polycube_rotations, "rotation of a rotated polycube wasnt in the set of all rotations for the initial pollycube, rotating it twice has changed its shape")
\ No newline at end of file
@@ -1,4 +1,10 @@
+from functools import lru_cache
 from libraries.cache import get_cache_raw
 
+@lru_cache(maxsize=1)
 def get_test_data():
-    return get_cache_raw('./tests/test_data.npy')
\ No newline at end of file
+    # loaded once and shared between tests, so it is made read only
+    test_data = tuple(get_cache_raw('./tests/test_data.npy'))
+    for polycube in test_data:
+        polycube.setflags(write=False)
+    return test_data
\ No newline at end of file